@@ -4,27 +4,38 @@
 from __future__ import annotations
 
 import argparse
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import cv2
+import numpy as np
 
 
 # 기본 출력 디렉터리(회색조 및 블러 이미지를 저장)
 DEFAULT_OUTPUT_DIR = Path("data/outputs/ch1")
 
+# 배치 모드에서 처리할 이미지 확장자 목록
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp")
+
 
 def parse_args() -> argparse.Namespace:
     """CLI 인자를 파싱한다."""
     parser = argparse.ArgumentParser(
         description="Validate OpenCV install and export grayscale/blurred images.",
     )
-    parser.add_argument(
+    inputs = parser.add_mutually_exclusive_group(required=True)
+    inputs.add_argument(
         "--source",
         type=Path,
-        required=True,
         help="Path to the source image (jpg/png/webp).",
     )
+    inputs.add_argument(
+        "--batch",
+        type=Path,
+        help="Directory of images to process in parallel instead of a single --source.",
+    )
     parser.add_argument(
         "--output-dir",
         type=Path,
@@ -37,6 +48,20 @@ def parse_args() -> argparse.Namespace:
         default=11,
         help="Gaussian blur kernel size (odd positive integer).",
     )
+    parser.add_argument(
+        "--blur-source",
+        choices=("gray", "color"),
+        default="gray",
+        help="Image to blur: the grayscale result (default, 1 channel) or the original color image.",
+    )
+    parser.add_argument(
+        "--png-level",
+        type=int,
+        choices=range(10),
+        default=1,
+        metavar="0-9",
+        help="PNG compression level for saved images (0 = fastest/largest, 9 = slowest/smallest).",
+    )
     return parser.parse_args()
 
 
@@ -49,10 +74,29 @@ def ensure_kernel(kernel: int) -> int:
 
 def load_image(path: Path) -> cv2.Mat:
     """이미지 파일을 로드하고 실패 시 예외를 발생시킨다."""
-    image = cv2.imread(str(path))
+    # 파일을 한 번에 읽은 뒤 메모리 버퍼에서 디코딩
+    buffer = np.fromfile(str(path), dtype=np.uint8)
+    image = cv2.imdecode(buffer, cv2.IMREAD_COLOR) if buffer.size else None
     if image is None:
         raise FileNotFoundError(f"Unable to load image: {path}")
-    return image
+    # 연속 메모리 uint8 배열이어야 cvtColor의 SIMD 정수 회색조 경로를 탄다(이미 연속이면 복사 없음)
+    return np.ascontiguousarray(image, dtype=np.uint8)
+
+
+def save_image(path: Path, image: np.ndarray, params: list[int] | None = None) -> None:
+    """이미지를 메모리에서 인코딩해 파일에 한 번에 쓰고 실패 시 예외를 발생시킨다."""
+    ok, encoded = cv2.imencode(path.suffix, image, params or [])
+    if not ok:
+        raise OSError(f"Failed to encode image: {path}")
+    # 인코딩된 버퍼를 libc 버퍼링 없이 파일 디스크립터에 직접 기록
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    fd = os.open(str(path), flags, 0o644)
+    try:
+        view = memoryview(encoded.reshape(-1))
+        while view:
+            view = view[os.write(fd, view) :]
+    finally:
+        os.close(fd)
 
 
 def build_output_paths(output_dir: Path, source_path: Path) -> tuple[Path, Path]:
@@ -63,6 +107,56 @@ def build_output_paths(output_dir: Path, source_path: Path) -> tuple[Path, Path]
     return gray_path, blur_path
 
 
+def iter_batch_images(directory: Path) -> list[Path]:
+    """배치 폴더에서 이미지 확장자를 가진 파일을 정렬해 반환한다."""
+    return sorted(p for p in directory.iterdir() if p.is_file() and p.suffix.lower() in IMAGE_EXTENSIONS)
+
+
+def process_one(source_path: Path, args: argparse.Namespace) -> tuple[Path, Path]:
+    """단일 이미지를 회색조/블러로 변환해 저장하고 출력 경로를 반환한다."""
+    image = load_image(source_path)
+
+    # 회색조 변환 및 가우시안 블러 적용(기본은 1채널 회색조를 블러해 처리량을 1/3로 줄임)
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    blur_input = gray if args.blur_source == "gray" else image
+    blur = cv2.GaussianBlur(blur_input, (args.blur_kernel, args.blur_kernel), sigmaX=0)
+
+    output_dir: Path = args.output_dir
+    output_dir.mkdir(parents=True, exist_ok=True)
+    gray_path, blur_path = build_output_paths(output_dir, source_path)
+    png_params = [cv2.IMWRITE_PNG_COMPRESSION, args.png_level]
+
+    save_image(gray_path, gray, png_params)
+    save_image(blur_path, blur, png_params)
+    return gray_path, blur_path
+
+
+def run_batch(batch_dir: Path, args: argparse.Namespace) -> int:
+    """폴더의 모든 이미지를 스레드 풀에서 병렬로 처리한다(OpenCV 연산은 GIL을 해제)."""
+    if not batch_dir.is_dir():
+        print(f"[ERROR] Batch directory not found: {batch_dir}", file=sys.stderr)
+        return 1
+    sources = iter_batch_images(batch_dir)
+    if not sources:
+        print(f"[ERROR] No images found in: {batch_dir}", file=sys.stderr)
+        return 1
+
+    failures = 0
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = [executor.submit(process_one, source, args) for source in sources]
+        for source, future in zip(sources, futures):
+            try:
+                gray_path, blur_path = future.result()
+            except OSError as err:
+                print(f"[ERROR] {err}", file=sys.stderr)
+                failures += 1
+                continue
+            print(f"  {source.name}: {gray_path}, {blur_path}")
+
+    print(f"Processed {len(sources) - failures}/{len(sources)} images from {batch_dir}")
+    return 1 if failures else 0
+
+
 def main() -> int:
     """스크립트 진입점: 환경 점검 및 이미지 전처리를 수행한다."""
     args = parse_args()
@@ -73,6 +167,10 @@ def main() -> int:
         print(f"[ERROR] {err}", file=sys.stderr)
         return 1
 
+    if args.batch is not None:
+        print(f"OpenCV version: {cv2.__version__}")
+        return run_batch(args.batch, args)
+
     source_path: Path = args.source
     if not source_path.is_file():
         print(f"[ERROR] Source image not found: {source_path}", file=sys.stderr)
@@ -81,26 +179,11 @@ def main() -> int:
     print(f"OpenCV version: {cv2.__version__}")
     print(f"Loading image: {source_path}")
     try:
-        image = load_image(source_path)
-    except FileNotFoundError as err:
+        gray_path, blur_path = process_one(source_path, args)
+    except OSError as err:
         print(f"[ERROR] {err}", file=sys.stderr)
         return 1
 
-    # 회색조 변환 및 가우시안 블러 적용
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    blur = cv2.GaussianBlur(image, (args.blur_kernel, args.blur_kernel), sigmaX=0)
-
-    output_dir: Path = args.output_dir
-    output_dir.mkdir(parents=True, exist_ok=True)
-    gray_path, blur_path = build_output_paths(output_dir, source_path)
-
-    if not cv2.imwrite(str(gray_path), gray):
-        print(f"[ERROR] Failed to write grayscale image: {gray_path}", file=sys.stderr)
-        return 1
-    if not cv2.imwrite(str(blur_path), blur):
-        print(f"[ERROR] Failed to write blurred image: {blur_path}", file=sys.stderr)
-        return 1
-
     # 저장 경로 로그
     print("Saved processed images:")
     print(f"  Grayscale: {gray_path}")
@@ -29,7 +29,7 @@ def parse_args() -> argparse.Namespace:
         "--grid-size",
         type=int,
         default=5,
-        help="Number of sample points per axis for the pixel grid display (>=1).",
+        help="Number of sample points per axis for the pixel grid display (>=1, capped at the image width/height).",
     )
     parser.add_argument(
         "--log",
@@ -42,40 +42,39 @@ def parse_args() -> argparse.Namespace:
 
 def load_image(path: Path) -> np.ndarray:
     """이미지를 로드하고 실패 시 예외를 발생시킨다."""
-    image = cv2.imread(str(path))
+    # 파일을 한 번에 읽은 뒤 메모리 버퍼에서 디코딩
+    buffer = np.fromfile(str(path), dtype=np.uint8)
+    image = cv2.imdecode(buffer, cv2.IMREAD_COLOR) if buffer.size else None
     if image is None:
         raise FileNotFoundError(f"Unable to load image: {path}")
     return image
 
 
-def format_pixel(value: np.ndarray) -> str:
-    """픽셀 값을 사람이 읽기 쉬운 문자열로 변환한다."""
-    if value.ndim == 0:
-        return f"({int(value):3d})"
-    channels = [int(channel) for channel in value]
-    formatted = ", ".join(f"{c:3d}" for c in channels)
+def format_pixel(value: int | list[int]) -> str:
+    """픽셀 값(정수 또는 채널 리스트)을 사람이 읽기 쉬운 문자열로 변환한다."""
+    if isinstance(value, int):
+        return f"({value:3d})"
+    formatted = ", ".join(f"{c:3d}" for c in value)
     return f"({formatted})"
 
 
 def sample_grid(image: np.ndarray, grid_size: int) -> list[str]:
     """이미지 전체에서 균등 간격으로 픽셀을 샘플링한다."""
     height, width = image.shape[:2]
-    ys = np.linspace(0, height - 1, grid_size, dtype=int)
-    xs = np.linspace(0, width - 1, grid_size, dtype=int)
+    # 해상도보다 큰 그리드는 같은 픽셀을 중복 샘플링하므로 축별 픽셀 수로 제한
+    ys = np.linspace(0, height - 1, min(grid_size, height), dtype=int)
+    xs = np.linspace(0, width - 1, min(grid_size, width), dtype=int)
 
-    rows: list[str] = []
-    for y in ys:
-        samples = [format_pixel(image[y, x]) for x in xs]
-        rows.append("  ".join(samples))
-    return rows
+    # 팬시 인덱싱으로 샘플을 한 번에 모은 뒤 파이썬 정수로 변환
+    grid = image[np.ix_(ys, xs)].tolist()
+    return ["  ".join(format_pixel(value) for value in row) for row in grid]
 
 
 def mean_color(image: np.ndarray) -> np.ndarray:
     """이미지의 평균 색상(또는 밝기)을 계산한다."""
-    if image.ndim == 2:
-        return np.array([float(image.mean())])
-    channels = image.reshape(-1, image.shape[2]).mean(axis=0)
-    return channels
+    channels = 1 if image.ndim == 2 else image.shape[2]
+    # cv2.mean은 최대 4채널 평균을 한 번에 반환하므로 실제 채널 수만큼 자른다
+    return np.asarray(cv2.mean(image)[:channels])
 
 
 def build_report(image: np.ndarray, source: Path, grid_size: int) -> str:
@@ -106,8 +105,8 @@ def build_report(image: np.ndarray, source: Path, grid_size: int) -> str:
         buffer.write(indent("\n".join(grid_rows), prefix="  "))
         buffer.write("\n")
 
-    min_val = image.min()
-    max_val = image.max()
+    # 채널을 펼쳐 한 번의 순회로 최솟값/최댓값을 함께 구한다
+    min_val, max_val, _, _ = cv2.minMaxLoc(image.reshape(-1))
     buffer.write(f"\nPixel value range: {int(min_val)} to {int(max_val)}\n")
 
     return buffer.getvalue()
@@ -3,32 +3,47 @@
 from __future__ import annotations
 
 import argparse
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import cv2
 import numpy as np
 
+from color_mask_numba import NUMBA_AVAILABLE, mask_bgr
+
 
 # 마스크 결과를 저장할 기본 폴더
 DEFAULT_OUTPUT_DIR = Path("data/outputs/ch2")
 
+# 배치 모드에서 처리할 이미지 확장자 목록
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp")
+
 
-def parse_hsv_triplet(value: str) -> np.ndarray:
-    """쉼표로 구분된 HSV 문자열을 uint8 배열로 변환한다."""
+def parse_hsv_triplet(value: str) -> tuple[int, int, int]:
+    """쉼표로 구분된 HSV 문자열을 inRange에 바로 넘길 정수 튜플로 변환한다."""
     try:
-        parts = [int(part.strip()) for part in value.split(",")]
+        parts = tuple(int(part.strip()) for part in value.split(","))
     except ValueError as err:
         raise argparse.ArgumentTypeError(f"Invalid HSV triplet '{value}': {err}") from err
     if len(parts) != 3:
         raise argparse.ArgumentTypeError("HSV triplet must contain exactly 3 integers.")
-    return np.array(parts, dtype=np.uint8)
+    if not all(0 <= part <= 255 for part in parts):
+        raise argparse.ArgumentTypeError("HSV values must be between 0 and 255.")
+    return parts
 
 
 def parse_args() -> argparse.Namespace:
     """CLI 인자를 정의하고 파싱한다."""
     parser = argparse.ArgumentParser(description="Apply an HSV color mask to isolate a region.")
-    parser.add_argument("--source", type=Path, required=True, help="Input image path.")
+    inputs = parser.add_mutually_exclusive_group(required=True)
+    inputs.add_argument("--source", type=Path, help="Input image path.")
+    inputs.add_argument(
+        "--batch",
+        type=Path,
+        help="Directory of images to process in parallel instead of a single --source.",
+    )
     parser.add_argument(
         "--lower-hsv",
         type=parse_hsv_triplet,
@@ -47,55 +62,153 @@ def parse_args() -> argparse.Namespace:
         default=DEFAULT_OUTPUT_DIR,
         help="Directory for saving the mask results.",
     )
+    parser.add_argument(
+        "--backend",
+        choices=("opencv", "numba"),
+        default="opencv",
+        help="Mask implementation: OpenCV cvtColor+inRange (default) or the fused Numba kernel.",
+    )
+    parser.add_argument(
+        "--png-level",
+        type=int,
+        choices=range(10),
+        default=1,
+        metavar="0-9",
+        help="PNG compression level for saved images (0 = fastest/largest, 9 = slowest/smallest).",
+    )
     return parser.parse_args()
 
 
+def png_params(level: int, binary: bool = False) -> list[int]:
+    """PNG 압축 수준(이진 이미지는 RLE 전략 포함) 저장 파라미터를 만든다."""
+    params = [cv2.IMWRITE_PNG_COMPRESSION, level]
+    if binary:
+        params += [cv2.IMWRITE_PNG_STRATEGY, cv2.IMWRITE_PNG_STRATEGY_RLE]
+    return params
+
+
 def load_image(path: Path) -> np.ndarray:
     """이미지를 로드하고 실패 시 예외를 발생시킨다."""
-    image = cv2.imread(str(path))
+    # 파일을 한 번에 읽은 뒤 메모리 버퍼에서 디코딩
+    buffer = np.fromfile(str(path), dtype=np.uint8)
+    image = cv2.imdecode(buffer, cv2.IMREAD_COLOR) if buffer.size else None
     if image is None:
         raise FileNotFoundError(f"Unable to load image: {path}")
     return image
 
 
-def main() -> int:
-    """스크립트 진입점: HSV 마스크를 적용하고 파일로 저장한다."""
-    args = parse_args()
+def save_image(path: Path, image: np.ndarray, params: list[int] | None = None) -> None:
+    """이미지를 메모리에서 인코딩해 파일에 한 번에 쓰고 실패 시 예외를 발생시킨다."""
+    ok, encoded = cv2.imencode(path.suffix, image, params or [])
+    if not ok:
+        raise OSError(f"Failed to encode image: {path}")
+    # 인코딩된 버퍼를 libc 버퍼링 없이 파일 디스크립터에 직접 기록
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    fd = os.open(str(path), flags, 0o644)
+    try:
+        view = memoryview(encoded.reshape(-1))
+        while view:
+            view = view[os.write(fd, view) :]
+    finally:
+        os.close(fd)
 
-    if not args.source.is_file():
-        print(f"[ERROR] Source image not found: {args.source}", file=sys.stderr)
-        return 1
 
-    try:
-        image = load_image(args.source)
-    except FileNotFoundError as err:
-        print(f"[ERROR] {err}", file=sys.stderr)
-        return 1
+def iter_batch_images(directory: Path) -> list[Path]:
+    """배치 폴더에서 이미지 확장자를 가진 파일을 정렬해 반환한다."""
+    return sorted(p for p in directory.iterdir() if p.is_file() and p.suffix.lower() in IMAGE_EXTENSIONS)
+
+
+def process_one(source: Path, args: argparse.Namespace) -> tuple[Path, Path, Path]:
+    """단일 이미지에 HSV 마스크를 적용해 저장하고 (원본, 마스크, 결과) 경로를 반환한다."""
+    image = load_image(source)
 
     # BGR → HSV 변환 후 원하는 범위만 마스킹
-    hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-    mask = cv2.inRange(hsv, args.lower_hsv, args.upper_hsv)
-    masked = cv2.bitwise_and(image, image, mask=mask)
+    if args.backend == "numba":
+        mask = mask_bgr(image, args.lower_hsv, args.upper_hsv)
+    else:
+        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+        mask = cv2.inRange(hsv, args.lower_hsv, args.upper_hsv)
+    masked = cv2.copyTo(image, mask)
 
     output_dir = args.output_dir
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    stem = args.source.stem
+    stem = source.stem
     before_path = output_dir / f"{stem}_mask_before.png"
     mask_path = output_dir / f"{stem}_mask.png"
     after_path = output_dir / f"{stem}_mask_after.png"
 
-    success = True
-    success &= cv2.imwrite(str(before_path), image)
-    success &= cv2.imwrite(str(mask_path), mask)
-    success &= cv2.imwrite(str(after_path), masked)
-    if not success:
-        print("[ERROR] Failed to write one or more output files.", file=sys.stderr)
+    save_image(before_path, image, png_params(args.png_level))
+    save_image(mask_path, mask, png_params(args.png_level, binary=True))
+    save_image(after_path, masked, png_params(args.png_level))
+    return before_path, mask_path, after_path
+
+
+def run_batch(batch_dir: Path, args: argparse.Namespace) -> int:
+    """폴더의 모든 이미지를 스레드 풀에서 병렬로 처리한다(OpenCV 연산은 GIL을 해제)."""
+    if not batch_dir.is_dir():
+        print(f"[ERROR] Batch directory not found: {batch_dir}", file=sys.stderr)
+        return 1
+    sources = iter_batch_images(batch_dir)
+    if not sources:
+        print(f"[ERROR] No images found in: {batch_dir}", file=sys.stderr)
+        return 1
+
+    failures = 0
+    if args.backend == "numba":
+        # numba 커널은 이미 prange로 병렬이고, 작업 스레드에서 호출하면 기본 스레딩 레이어가
+        # 종료 시 멈출 수 있으므로 메인 스레드에서 순서대로 실행한다
+        for source in sources:
+            try:
+                paths = process_one(source, args)
+            except OSError as err:
+                print(f"[ERROR] {err}", file=sys.stderr)
+                failures += 1
+                continue
+            print(f"  {source.name}: " + ", ".join(str(path) for path in paths))
+    else:
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = [executor.submit(process_one, source, args) for source in sources]
+            for source, future in zip(sources, futures):
+                try:
+                    paths = future.result()
+                except OSError as err:
+                    print(f"[ERROR] {err}", file=sys.stderr)
+                    failures += 1
+                    continue
+                print(f"  {source.name}: " + ", ".join(str(path) for path in paths))
+
+    print(f"Processed {len(sources) - failures}/{len(sources)} images from {batch_dir}")
+    return 1 if failures else 0
+
+
+def main() -> int:
+    """스크립트 진입점: HSV 마스크를 적용하고 파일로 저장한다."""
+    args = parse_args()
+
+    if args.backend == "numba" and not NUMBA_AVAILABLE:
+        print("[ERROR] numba is required for --backend numba. Install with 'pip install numba'.", file=sys.stderr)
+        return 1
+
+    if args.batch is not None:
+        print("Color mask ranges:")
+        print(f"  Lower HSV: {list(args.lower_hsv)}")
+        print(f"  Upper HSV: {list(args.upper_hsv)}")
+        return run_batch(args.batch, args)
+
+    if not args.source.is_file():
+        print(f"[ERROR] Source image not found: {args.source}", file=sys.stderr)
+        return 1
+
+    try:
+        before_path, mask_path, after_path = process_one(args.source, args)
+    except OSError as err:
+        print(f"[ERROR] {err}", file=sys.stderr)
         return 1
 
     print("Color mask generated with the following ranges:")
-    print(f"  Lower HSV: {args.lower_hsv.tolist()}")
-    print(f"  Upper HSV: {args.upper_hsv.tolist()}")
+    print(f"  Lower HSV: {list(args.lower_hsv)}")
+    print(f"  Upper HSV: {list(args.upper_hsv)}")
     print("Saved results:")
     print(f"  Original : {before_path}")
     print(f"  Mask     : {mask_path}")
@@ -0,0 +1,85 @@
+"""한글 주석 버전: BGR→HSV 변환과 inRange를 한 번의 픽셀 순회로 합친 Numba 마스크 커널."""
+
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # pragma: no cover - handled at runtime
+    njit = None  # type: ignore
+    prange = range  # type: ignore
+
+# numba 설치 여부(호출 측에서 백엔드 선택 전에 확인)
+NUMBA_AVAILABLE = njit is not None
+
+
+# OpenCV의 8비트 BGR2HSV와 동일한 고정소수점 시프트/색상 범위
+HSV_SHIFT = 12
+HUE_RANGE = 180
+
+# OpenCV 구현과 같은 방식으로 만든 나눗셈 테이블(0 인덱스는 0)
+_indices = np.arange(256, dtype=np.float64)
+with np.errstate(divide="ignore"):
+    SDIV_TABLE = np.where(_indices > 0, np.rint((255 << HSV_SHIFT) / _indices), 0).astype(np.int64)
+    HDIV_TABLE = np.where(_indices > 0, np.rint((HUE_RANGE << HSV_SHIFT) / (6.0 * _indices)), 0).astype(np.int64)
+
+
+def _mask_kernel(image, lower, upper, sdiv, hdiv, out):
+    """픽셀마다 H/S/V를 계산하고 범위 비교까지 마친 결과를 out에 기록한다."""
+    height, width = out.shape
+    half = 1 << (HSV_SHIFT - 1)
+    for y in prange(height):
+        for x in range(width):
+            b = np.int64(image[y, x, 0])
+            g = np.int64(image[y, x, 1])
+            r = np.int64(image[y, x, 2])
+            v = max(b, g, r)
+            diff = v - min(b, g, r)
+            s = (diff * sdiv[v] + half) >> HSV_SHIFT
+            if v == r:
+                h = g - b
+            elif v == g:
+                h = b - r + 2 * diff
+            else:
+                h = r - g + 4 * diff
+            h = (h * hdiv[diff] + half) >> HSV_SHIFT
+            if h < 0:
+                h += HUE_RANGE
+            inside = (
+                lower[0] <= h <= upper[0]
+                and lower[1] <= s <= upper[1]
+                and lower[2] <= v <= upper[2]
+            )
+            out[y, x] = 255 if inside else 0
+
+
+_mask_kernel_jit = njit(parallel=True, cache=True)(_mask_kernel) if NUMBA_AVAILABLE else None
+
+# 커널 자체가 병렬이고 numba 기본 스레딩 레이어는 동시 호출을 지원하지 않으므로 호출을 직렬화
+_KERNEL_LOCK = threading.Lock()
+
+
+def mask_bgr(
+    image: np.ndarray,
+    lower: tuple[int, int, int],
+    upper: tuple[int, int, int],
+) -> np.ndarray:
+    """cv2.cvtColor(BGR2HSV) + cv2.inRange와 같은 uint8 마스크를 한 번의 순회로 만든다."""
+    if _mask_kernel_jit is None:
+        raise RuntimeError("numba is required for color_mask_numba.py")
+    if image.ndim != 3 or image.shape[2] != 3 or image.dtype != np.uint8:
+        raise ValueError("mask_bgr expects a uint8 BGR image of shape (H, W, 3).")
+    out = np.empty(image.shape[:2], dtype=np.uint8)
+    with _KERNEL_LOCK:
+        _mask_kernel_jit(
+            np.ascontiguousarray(image),
+            np.asarray(lower, dtype=np.int64),
+            np.asarray(upper, dtype=np.int64),
+            SDIV_TABLE,
+            HDIV_TABLE,
+            out,
+        )
+    return out
@@ -4,9 +4,11 @@ from __future__ import annotations
 
 import argparse
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
 import cv2
+import numpy as np
 
 
 # 기본 출력 이미지 경로(생략 시 이 경로로 저장)
@@ -75,6 +77,42 @@ def compute_box(width: int, height: int, margin_ratio: float) -> tuple[int, int,
     return x1, y1, x2, y2
 
 
+@lru_cache(maxsize=32)
+def render_label_mask(text: str, font: int, scale: float, thickness: int) -> tuple[np.ndarray, int, int]:
+    """라벨 텍스트를 한 번만 래스터화해 (알파 마스크, 기준점 x, 기준점 y)를 반환한다."""
+    (text_w, text_h), baseline = cv2.getTextSize(text, font, scale, thickness)
+    pad = thickness
+    mask = np.zeros((text_h + baseline + 2 * pad, text_w + 2 * pad), dtype=np.uint8)
+    cv2.putText(mask, text, (pad, pad + text_h), font, scale, 255, thickness)
+    # 캐시된 알파는 여러 호출에서 공유되므로 읽기 전용으로 고정
+    alpha = (mask.astype(np.float32) / 255.0)[:, :, None]
+    alpha.flags.writeable = False
+    return alpha, pad, pad + text_h
+
+
+def draw_label(
+    image: np.ndarray,
+    text: str,
+    origin: tuple[int, int],
+    font: int,
+    scale: float,
+    color: tuple[int, int, int],
+    thickness: int,
+) -> None:
+    """캐시된 라벨 알파를 origin(텍스트 좌하단 기준점)에 색상으로 합성한다."""
+    alpha, anchor_x, anchor_y = render_label_mask(text, font, scale, thickness)
+    x0, y0 = origin[0] - anchor_x, origin[1] - anchor_y
+    height, width = image.shape[:2]
+    left, top = max(x0, 0), max(y0, 0)
+    right, bottom = min(x0 + alpha.shape[1], width), min(y0 + alpha.shape[0], height)
+    if left >= right or top >= bottom:
+        return
+    roi = image[top:bottom, left:right]
+    weight = alpha[top - y0 : bottom - y0, left - x0 : right - x0]
+    blended = roi * (1.0 - weight) + np.array(color, dtype=np.float32) * weight
+    np.copyto(roi, np.rint(blended).astype(image.dtype))
+
+
 def main() -> int:
     """스크립트 진입점: 이미지에 박스를 그리고 저장한다."""
     args = parse_args()
@@ -83,7 +121,8 @@ def main() -> int:
         raise SystemExit(f"Source image not found: {args.source}")
 
     # 원본 이미지 로드
-    image = cv2.imread(str(args.source))
+    buffer = np.fromfile(str(args.source), dtype=np.uint8)
+    image = cv2.imdecode(buffer, cv2.IMREAD_COLOR) if buffer.size else None
     if image is None:
         raise SystemExit(f"Failed to read image: {args.source}")
 
@@ -94,20 +133,19 @@ def main() -> int:
     else:
         x1, y1, x2, y2 = args.bbox
 
-    # 시각화용 복사본 생성
-    annotated = image.copy()
-    cv2.rectangle(annotated, (x1, y1), (x2, y2), color=(0, 180, 255), thickness=3)
+    # 원본은 이후 크기 정보만 쓰므로 복사본 없이 디코딩 버퍼에 직접 그린다
+    cv2.rectangle(image, (x1, y1), (x2, y2), color=(0, 180, 255), thickness=3)
 
     center = ((x1 + x2) // 2, (y1 + y2) // 2)
-    cv2.circle(annotated, center, radius=8, color=(0, 255, 0), thickness=-1)
+    cv2.circle(image, center, radius=8, color=(0, 255, 0), thickness=-1)
 
     label_position = (x1, max(y1 - 12, 24))
-    cv2.putText(
-        annotated,
+    draw_label(
+        image,
         args.label,
         label_position,
-        fontFace=cv2.FONT_HERSHEY_DUPLEX,
-        fontScale=0.9,
+        font=cv2.FONT_HERSHEY_DUPLEX,
+        scale=0.9,
         color=(255, 255, 255),
         thickness=2,
     )
@@ -115,7 +153,7 @@ def main() -> int:
     timestamp = datetime.now().strftime(args.timestamp_format)
     footer_y = min(y2 + 30, height - 12)
     cv2.putText(
-        annotated,
+        image,
         timestamp,
         (x1, footer_y),
         fontFace=cv2.FONT_HERSHEY_SIMPLEX,
@@ -127,7 +165,7 @@ def main() -> int:
     output_path = args.output
     # 출력 경로 확보 후 저장
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    if not cv2.imwrite(str(output_path), annotated):
+    if not cv2.imwrite(str(output_path), image):
         raise SystemExit(f"Failed to write annotated image: {output_path}")
 
     print("Annotation completed")
@@ -3,20 +3,33 @@
 from __future__ import annotations
 
 import argparse
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 import cv2
+import numpy as np
 
 
 # 중간 산출물을 저장할 기본 폴더
 DEFAULT_OUTPUT_DIR = Path("data/outputs/ch2")
 
+# 배치 모드에서 처리할 이미지 확장자 목록
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp")
+
 
 def parse_args() -> argparse.Namespace:
     """CLI 인자를 정의하고 파싱한다."""
     parser = argparse.ArgumentParser(description="Run resize -> gray -> blur -> edges pipeline on an image.")
-    parser.add_argument("--source", type=Path, required=True, help="Input image path.")
+    inputs = parser.add_mutually_exclusive_group(required=True)
+    inputs.add_argument("--source", type=Path, help="Input image path.")
+    inputs.add_argument(
+        "--batch",
+        type=Path,
+        help="Directory of images to process in parallel instead of a single --source.",
+    )
     parser.add_argument(
         "--output-dir",
         type=Path,
@@ -36,15 +49,41 @@ def parse_args() -> argparse.Namespace:
         default="80,160",
         help="Low,High thresholds for Canny edge detector (comma separated).",
     )
+    parser.add_argument(
+        "--canny-stripes",
+        type=int,
+        default=1,
+        help="Split the Canny stage into this many horizontal stripes run on separate threads (1 = single call).",
+    )
+    parser.add_argument(
+        "--png-level",
+        type=int,
+        choices=range(10),
+        default=1,
+        metavar="0-9",
+        help="PNG compression level for saved images (0 = fastest/largest, 9 = slowest/smallest).",
+    )
+    parser.add_argument(
+        "--save-intermediates",
+        action="store_true",
+        help="Also save the resized/gray/blur step images (default saves only the edge map).",
+    )
+    parser.add_argument(
+        "--opencl",
+        action="store_true",
+        help="Run the pipeline on cv2.UMat via OpenCV's OpenCL backend when available.",
+    )
     return parser.parse_args()
 
 
-def validate_args(scale: float, kernel: int) -> None:
-    """리사이즈 배율과 블러 커널 조건을 검증한다."""
+def validate_args(scale: float, kernel: int, stripes: int = 1) -> None:
+    """리사이즈 배율, 블러 커널, 캐니 분할 수 조건을 검증한다."""
     if not (0 < scale <= 1.5):
         raise ValueError("--scale must be between 0 and 1.5 (exclusive of 0).")
     if kernel <= 0 or kernel % 2 == 0:
         raise ValueError("--blur-kernel must be an odd positive integer.")
+    if stripes < 1:
+        raise ValueError("--canny-stripes must be at least 1.")
 
 
 def parse_canny_thresholds(value: str) -> tuple[int, int]:
@@ -60,86 +99,196 @@ def parse_canny_thresholds(value: str) -> tuple[int, int]:
     return low, high
 
 
+@lru_cache(maxsize=None)
+def gaussian_kernel(ksize: int) -> cv2.Mat:
+    """커널 크기별 1차원 가우시안 커널을 생성하고 캐시한다."""
+    return cv2.getGaussianKernel(ksize, 0)
+
+
+def png_params(level: int, binary: bool = False) -> list[int]:
+    """PNG 압축 수준(이진 이미지는 RLE 전략 포함) 저장 파라미터를 만든다."""
+    params = [cv2.IMWRITE_PNG_COMPRESSION, level]
+    if binary:
+        params += [cv2.IMWRITE_PNG_STRATEGY, cv2.IMWRITE_PNG_STRATEGY_RLE]
+    return params
+
+
+def striped_canny(image: np.ndarray, low: int, high: int, stripes: int, halo: int) -> np.ndarray:
+    """이미지를 가로 띠로 나눠 스레드별로 Canny를 실행하고 결과를 이어 붙인다.
+
+    각 띠는 위아래로 halo 행만큼 겹쳐 처리해 경계의 그래디언트/비최대 억제를 보존한다.
+    히스테리시스 연결은 띠 경계를 넘지 못하므로 경계 부근 약한 에지는 단일 호출과 다를 수 있다.
+    """
+    height = image.shape[0]
+    bounds = np.linspace(0, height, min(stripes, height) + 1, dtype=int)
+    edges = np.empty_like(image)
+
+    def run_stripe(index: int) -> None:
+        top, bottom = bounds[index], bounds[index + 1]
+        start, stop = max(top - halo, 0), min(bottom + halo, height)
+        band = cv2.Canny(image[start:stop], threshold1=low, threshold2=high)
+        edges[top:bottom] = band[top - start : bottom - start]
+
+    with ThreadPoolExecutor(max_workers=len(bounds) - 1) as executor:
+        list(executor.map(run_stripe, range(len(bounds) - 1)))
+    return edges
+
+
 def load_image(path: Path) -> cv2.Mat:
     """이미지를 로드하고 실패 시 예외를 발생시킨다."""
-    image = cv2.imread(str(path))
+    # 파일을 한 번에 읽은 뒤 메모리 버퍼에서 디코딩
+    buffer = np.fromfile(str(path), dtype=np.uint8)
+    image = cv2.imdecode(buffer, cv2.IMREAD_COLOR) if buffer.size else None
     if image is None:
         raise FileNotFoundError(f"Unable to load image: {path}")
     return image
 
 
-def save_image(path: Path, image: cv2.Mat) -> None:
-    """결과 이미지를 저장하고 실패 시 예외를 발생시킨다."""
+def save_image(path: Path, image: cv2.Mat | cv2.UMat, params: list[int] | None = None) -> None:
+    """결과 이미지를 메모리에서 인코딩해 파일에 한 번에 쓰고 실패 시 예외를 발생시킨다."""
     path.parent.mkdir(parents=True, exist_ok=True)
-    if not cv2.imwrite(str(path), image):
-        raise OSError(f"Failed to write image: {path}")
+    if isinstance(image, cv2.UMat):
+        # 디바이스 버퍼는 저장 직전에만 호스트로 내려받는다
+        image = image.get()
+    ok, encoded = cv2.imencode(path.suffix, image, params or [])
+    if not ok:
+        raise OSError(f"Failed to encode image: {path}")
+    # 인코딩된 버퍼를 libc 버퍼링 없이 파일 디스크립터에 직접 기록
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    fd = os.open(str(path), flags, 0o644)
+    try:
+        view = memoryview(encoded.reshape(-1))
+        while view:
+            view = view[os.write(fd, view) :]
+    finally:
+        os.close(fd)
 
 
-def main() -> int:
-    """스크립트 진입점: 전처리 파이프라인을 순차 실행한다."""
-    args = parse_args()
+def iter_batch_images(directory: Path) -> list[Path]:
+    """배치 폴더에서 이미지 확장자를 가진 파일을 정렬해 반환한다."""
+    return sorted(p for p in directory.iterdir() if p.is_file() and p.suffix.lower() in IMAGE_EXTENSIONS)
 
-    try:
-        validate_args(args.scale, args.blur_kernel)
-        canny_low, canny_high = parse_canny_thresholds(args.canny_thresholds)
-    except ValueError as err:
-        print(f"[ERROR] {err}", file=sys.stderr)
-        return 1
 
-    # 입력 이미지 존재 여부 확인
-    if not args.source.is_file():
-        print(f"[ERROR] Source image not found: {args.source}", file=sys.stderr)
-        return 1
+def process_one(
+    source: Path,
+    args: argparse.Namespace,
+    canny_thresholds: tuple[int, int],
+    use_opencl: bool,
+) -> list[tuple[str, Path]]:
+    """단일 이미지에 파이프라인을 실행하고 저장한 (단계 이름, 경로) 목록을 반환한다."""
+    image = load_image(source)
+    # OpenCL 사용 시 UMat으로 감싸 이후 단계를 디바이스에서 이어서 처리
+    if use_opencl:
+        image = cv2.UMat(image)
 
-    try:
-        image = load_image(args.source)
-    except FileNotFoundError as err:
-        print(f"[ERROR] {err}", file=sys.stderr)
-        return 1
-
-    stem = args.source.stem
+    stem = source.stem
+    saved: list[tuple[str, Path]] = []
 
     # 1단계: 리사이즈
     resized = cv2.resize(image, None, fx=args.scale, fy=args.scale, interpolation=cv2.INTER_AREA)
-    resized_path = args.output_dir / f"{stem}_step1_resized.png"
-    try:
-        save_image(resized_path, resized)
-    except OSError as err:
-        print(f"[ERROR] {err}", file=sys.stderr)
-        return 1
+    if args.save_intermediates:
+        resized_path = args.output_dir / f"{stem}_step1_resized.png"
+        save_image(resized_path, resized, png_params(args.png_level))
+        saved.append(("Resize", resized_path))
 
     # 2단계: 그레이스케일 변환
     gray = cv2.cvtColor(resized, cv2.COLOR_BGR2GRAY)
-    gray_path = args.output_dir / f"{stem}_step2_gray.png"
-    try:
-        save_image(gray_path, gray)
-    except OSError as err:
-        print(f"[ERROR] {err}", file=sys.stderr)
+    if args.save_intermediates:
+        gray_path = args.output_dir / f"{stem}_step2_gray.png"
+        save_image(gray_path, gray, png_params(args.png_level))
+        saved.append(("Gray", gray_path))
+
+    # 3단계: 가우시안 블러(1차원 커널을 행/열로 나눠 적용)
+    kernel = gaussian_kernel(args.blur_kernel)
+    blur = cv2.sepFilter2D(gray, -1, kernel, kernel)
+    if args.save_intermediates:
+        blur_path = args.output_dir / f"{stem}_step3_blur.png"
+        save_image(blur_path, blur, png_params(args.png_level))
+        saved.append(("Blur", blur_path))
+
+    # 4단계: 캐니 에지 추출(CPU 경로에서는 가로 띠 단위로 나눠 병렬 처리 가능)
+    canny_low, canny_high = canny_thresholds
+    if args.canny_stripes > 1 and not isinstance(blur, cv2.UMat):
+        halo = max(args.blur_kernel // 2, 2)
+        edges = striped_canny(blur, canny_low, canny_high, args.canny_stripes, halo)
+    else:
+        edges = cv2.Canny(blur, threshold1=canny_low, threshold2=canny_high)
+    edges_path = args.output_dir / f"{stem}_edges.png"
+    save_image(edges_path, edges, png_params(args.png_level, binary=True))
+    saved.append(("Edges", edges_path))
+    return saved
+
+
+def run_batch(
+    batch_dir: Path,
+    args: argparse.Namespace,
+    canny_thresholds: tuple[int, int],
+    use_opencl: bool,
+) -> int:
+    """폴더의 모든 이미지를 스레드 풀에서 병렬로 처리한다(OpenCV 연산은 GIL을 해제)."""
+    if not batch_dir.is_dir():
+        print(f"[ERROR] Batch directory not found: {batch_dir}", file=sys.stderr)
         return 1
+    sources = iter_batch_images(batch_dir)
+    if not sources:
+        print(f"[ERROR] No images found in: {batch_dir}", file=sys.stderr)
+        return 1
+
+    failures = 0
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = [
+            executor.submit(process_one, source, args, canny_thresholds, use_opencl) for source in sources
+        ]
+        for source, future in zip(sources, futures):
+            try:
+                saved = future.result()
+            except OSError as err:
+                print(f"[ERROR] {err}", file=sys.stderr)
+                failures += 1
+                continue
+            print(f"  {source.name}: " + ", ".join(str(path) for _, path in saved))
+
+    print(f"Processed {len(sources) - failures}/{len(sources)} images from {batch_dir}")
+    return 1 if failures else 0
+
+
+def main() -> int:
+    """스크립트 진입점: 전처리 파이프라인을 순차 실행한다."""
+    args = parse_args()
+
+    # OpenCV 내부 병렬화가 모든 코어와 최적화 경로를 쓰도록 설정
+    cv2.setUseOptimized(True)
+    cv2.setNumThreads(os.cpu_count() or 1)
 
-    # 3단계: 가우시안 블러
-    blur = cv2.GaussianBlur(gray, (args.blur_kernel, args.blur_kernel), sigmaX=0)
-    blur_path = args.output_dir / f"{stem}_step3_blur.png"
     try:
-        save_image(blur_path, blur)
-    except OSError as err:
+        validate_args(args.scale, args.blur_kernel, args.canny_stripes)
+        canny_thresholds = parse_canny_thresholds(args.canny_thresholds)
+    except ValueError as err:
         print(f"[ERROR] {err}", file=sys.stderr)
         return 1
 
-    # 4단계: 캐니 에지 추출
-    edges = cv2.Canny(blur, threshold1=canny_low, threshold2=canny_high)
-    edges_path = args.output_dir / f"{stem}_edges.png"
+    use_opencl = args.opencl and cv2.ocl.haveOpenCL()
+    if args.opencl and not use_opencl:
+        print("[WARN] OpenCL is not available; running on the CPU.", file=sys.stderr)
+    cv2.ocl.setUseOpenCL(use_opencl)
+
+    if args.batch is not None:
+        return run_batch(args.batch, args, canny_thresholds, use_opencl)
+
+    # 입력 이미지 존재 여부 확인
+    if not args.source.is_file():
+        print(f"[ERROR] Source image not found: {args.source}", file=sys.stderr)
+        return 1
+
     try:
-        save_image(edges_path, edges)
+        saved = process_one(args.source, args, canny_thresholds, use_opencl)
     except OSError as err:
         print(f"[ERROR] {err}", file=sys.stderr)
         return 1
 
     print("Preprocessing pipeline complete:")
-    print(f"  Resize : {resized_path}")
-    print(f"  Gray   : {gray_path}")
-    print(f"  Blur   : {blur_path}")
-    print(f"  Edges  : {edges_path}")
+    for step, path in saved:
+        print(f"  {step:<7}: {path}")
     return 0
 
 
@@ -0,0 +1,87 @@
+"""한글 주석 버전: kernels.py의 박스 변환 커널을 미리 컴파일해 첫 실행의 JIT 지연을 없앤다."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+import kernels
+
+# 미리 컴파일한 확장 모듈 이름(kernels.py가 찾으면 JIT보다 우선 사용)
+AOT_MODULE = "kernels_aot"
+
+# 임의 배치(A) 1차원 배열이라 행 배열의 열 슬라이스와 C 연속 열을 모두 받는다
+KERNEL_SIGNATURE = "void(f8[:], f8[:], f8[:], f8[:], f8, f8, f8[:, :])"
+
+
+def parse_args() -> argparse.Namespace:
+    """CLI 인자를 정의하고 파싱한다."""
+    parser = argparse.ArgumentParser(description="Pre-compile the numba box conversion kernel used by export_detections.py.")
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=Path(__file__).resolve().parent,
+        help="Where to place the compiled kernels_aot extension (defaults to this scripts directory).",
+    )
+    parser.add_argument(
+        "--cache-only",
+        action="store_true",
+        help="Skip ahead-of-time compilation and only populate numba's on-disk JIT cache.",
+    )
+    return parser.parse_args()
+
+
+def build_aot(output_dir: Path) -> Path:
+    """numba.pycc로 커널을 공유 라이브러리로 컴파일하고 생성된 파일 경로를 반환한다."""
+    with warnings.catch_warnings():
+        # numba.pycc는 지원 중단 예정이지만 대체 AOT 도구가 나오기 전까지는 그대로 사용
+        warnings.simplefilter("ignore")
+        from numba.pycc import CC
+
+    cc = CC(AOT_MODULE)
+    cc.output_dir = str(output_dir)
+    cc.verbose = False
+    cc.export("norm_to_pixels", KERNEL_SIGNATURE)(kernels._norm_to_pixels_loop)
+    cc.compile()
+    return output_dir / cc.output_file
+
+
+def warm_jit_cache() -> None:
+    """export_detections가 쓰는 두 가지 배열 배치로 커널을 호출해 디스크 캐시를 채운다."""
+    rows = np.zeros((1, 6), dtype=np.float64)
+    out = np.empty((1, 4), dtype=np.float64)
+    # 행 배열의 열 슬라이스(convert_label_rows)와 연속 배열(convert_label_columns) 모두 컴파일
+    kernels._norm_to_pixels_jit(rows[:, 1], rows[:, 2], rows[:, 3], rows[:, 4], 1.0, 1.0, out)
+    cx, cy, w, h = np.ascontiguousarray(rows[:, 1:5].T)
+    kernels._norm_to_pixels_jit(cx, cy, w, h, 1.0, 1.0, out)
+
+
+def main() -> int:
+    """스크립트 진입점: AOT 컴파일 후 JIT 캐시를 준비한다."""
+    args = parse_args()
+
+    if not kernels.NUMBA_AVAILABLE:
+        print("[ERROR] numba is required to compile kernels; install it with 'pip install numba'.", file=sys.stderr)
+        return 1
+
+    if not args.cache_only:
+        try:
+            args.output_dir.mkdir(parents=True, exist_ok=True)
+            output_file = build_aot(args.output_dir)
+        except (ImportError, OSError, RuntimeError) as err:
+            # C 컴파일러가 없거나 pycc가 제거된 환경에서는 JIT 캐시만 사용
+            print(f"[WARN] Ahead-of-time compilation failed, falling back to the JIT cache: {err}", file=sys.stderr)
+        else:
+            print(f"Compiled {AOT_MODULE} to {output_file}")
+
+    warm_jit_cache()
+    print("Populated numba JIT cache for kernels.norm_to_pixels")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -12,6 +12,11 @@ try:
 except ImportError:  # pragma: no cover - handled at runtime
     pd = None  # type: ignore
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore
+
 
 def parse_args() -> argparse.Namespace:
     """CLI 인자를 정의하고 파싱한다."""
@@ -37,6 +42,9 @@ def load_detections(path: Path) -> list[dict]:
     """JSON 파일을 읽어 파이썬 객체로 변환한다."""
     if not path.is_file():
         raise FileNotFoundError(f"Input JSON not found: {path}")
+    if orjson is not None:
+        # 문자열 디코딩 없이 바이트에서 바로 파싱
+        return orjson.loads(path.read_bytes())
     return json.loads(path.read_text(encoding="utf-8"))
 
 
@@ -45,23 +53,15 @@ def build_dataframe(records: list[dict]):
     if pd is None:
         raise RuntimeError("pandas is required for detection_summary.py")
 
-    rows = []
-    for record in records:
-        image = record.get("image")
-        for det in record.get("detections", []):
-            rows.append(
-                {
-                    "image": image,
-                    "class_id": det.get("class_id"),
-                    "class_name": det.get("class_name"),
-                    "confidence": float(det.get("confidence") or 0.0),
-                }
-            )
-
-    if not rows:
+    # 감지가 있는 레코드만 pandas가 한 번에 펼치도록 넘긴다
+    records = [record for record in records if record.get("detections")]
+    if not records:
         return pd.DataFrame(columns=["class_id", "class_name", "confidence", "image"])
 
-    return pd.DataFrame(rows)
+    df = pd.json_normalize(records, record_path="detections", meta=["image"], errors="ignore")
+    df = df.reindex(columns=["image", "class_id", "class_name", "confidence"])
+    df["confidence"] = pd.to_numeric(df["confidence"], errors="coerce").fillna(0.0)
+    return df
 
 
 def summarise(df, sort_by: str):
@@ -69,12 +69,10 @@ def summarise(df, sort_by: str):
     if df.empty:
         return pd.DataFrame(columns=["class_display", "class_id", "num_detections", "mean_confidence", "max_confidence"])
 
-    df = df.assign(
-        class_display=df.apply(
-            lambda row: row["class_name"] if row["class_name"] else f"class_{row['class_id']}",
-            axis=1,
-        )
-    )
+    # 행 단위 apply 대신 열 단위 연산으로 표시용 클래스 이름을 만든다
+    name = df["class_name"].astype("string")
+    fallback = "class_" + df["class_id"].astype("string")
+    df = df.assign(class_display=name.where(name.notna() & (name != ""), fallback))
 
     summary = (
         df.groupby(["class_display", "class_id"], dropna=False)
@@ -97,7 +95,11 @@ def save_output(df, path: Path) -> None:
     if suffix == ".csv":
         df.to_csv(path, index=False)
     elif suffix == ".json":
-        df.to_json(path, orient="records", indent=2)
+        if orjson is not None:
+            options = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+            path.write_bytes(orjson.dumps(df.to_dict("records"), option=options))
+        else:
+            df.to_json(path, orient="records", indent=2)
     else:
         raise ValueError("Unsupported output format; use .csv or .json")
 
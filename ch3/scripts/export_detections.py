@@ -3,20 +3,41 @@
 from __future__ import annotations
 
 import argparse
+import io
 import json
+import os
+import struct
 import sys
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Iterable
+from typing import BinaryIO, Iterable
 
-import cv2
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore
+
+from kernels import norm_to_pixels
+from refine_detections import parse_class_filter, refine_records
 
 
 # 이미지 파일을 찾을 때 사용할 확장자 목록
 IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp")
 
+# 레이블/이미지 헤더 읽기를 동시에 진행할 최대 요청 수(파싱 작업자 수와는 별개)
+MAX_IO_WORKERS = 64
+
+# 크기 정보를 담은 JPEG SOF 마커(허프만/산술, 기본/프로그레시브 등)
+JPEG_SOF_MARKERS = frozenset({0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF})
+
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Detection:
     """각 감지 객체 정보를 표현하는 데이터 구조."""
 
@@ -27,6 +48,17 @@ class Detection:
     bbox_pixels: tuple[int, int, int, int]
 
 
+def parse_image_size(value: str) -> tuple[int, int]:
+    """'WxH' 형식의 해상도 문자열을 (width, height) 정수 튜플로 변환한다."""
+    try:
+        width, height = (int(part) for part in value.lower().split("x"))
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(f"Invalid image size '{value}': expected WxH, e.g. 640x480") from err
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError("Image width and height must be positive.")
+    return width, height
+
+
 def parse_args() -> argparse.Namespace:
     """CLI 인자를 정의하고 파싱한다."""
     parser = argparse.ArgumentParser(description="Export YOLO TXT detections to JSON.")
@@ -49,16 +81,53 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Store image_path relative to --runs-dir instead of absolute paths.",
     )
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="Store each image's detections as column arrays (class_id, x1..y2, cx..h) instead of one object "
+        "per detection; refine_detections.py expects the default layout.",
+    )
+    parser.add_argument(
+        "--image-size",
+        type=parse_image_size,
+        default=None,
+        metavar="WxH",
+        help="Use this resolution for every label instead of reading image headers; labels without a matching "
+        "image are exported with image set to the label name and image_path null.",
+    )
+    # 아래 옵션을 주면 refine_detections.py와 같은 정제를 JSON 왕복 없이 바로 적용
+    parser.add_argument(
+        "--min-conf",
+        type=float,
+        default=None,
+        help="Refine in-process: minimum confidence threshold (inclusive), as in refine_detections.py.",
+    )
+    parser.add_argument(
+        "--classes",
+        type=str,
+        default=None,
+        help="Refine in-process: comma-separated class filter (accepts names and/or numeric ids).",
+    )
+    parser.add_argument(
+        "--drop-empty",
+        action="store_true",
+        help="Refine in-process: skip images with zero detections after filtering.",
+    )
+    parser.add_argument(
+        "--sort-desc",
+        action="store_true",
+        help="Refine in-process: sort detections by confidence descending.",
+    )
     return parser.parse_args()
 
 
-def load_class_names(path: Path | None) -> list[str] | None:
-    """클래스 이름 파일을 읽어 리스트로 반환한다."""
+def load_class_names(path: Path | None) -> tuple[str, ...] | None:
+    """클래스 이름 파일을 읽어 튜플로 반환한다."""
     if path is None:
         return None
     if not path.is_file():
         raise FileNotFoundError(f"Class names file not found: {path}")
-    names = [line.strip() for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+    names = tuple(line.strip() for line in path.read_text(encoding="utf-8").splitlines() if line.strip())
     return names or None
 
 
@@ -77,21 +146,193 @@ def resolve_labels_dir(runs_dir: Path, override: Path | None) -> Path:
     raise FileNotFoundError(f"Could not locate a 'labels' directory under {runs_dir}")
 
 
-def find_image_for_label(runs_dir: Path, label_path: Path) -> Path:
-    """레이블 파일과 동일한 이름의 이미지를 찾는다."""
-    stem = label_path.stem
-    base_dir = label_path.parent.parent if label_path.parent.name == "labels" else runs_dir
-    for directory in {runs_dir, base_dir}:
-        for ext in IMAGE_EXTENSIONS:
-            candidate = directory / f"{stem}{ext}"
-            if candidate.is_file():
-                return candidate
-    # Search recursively as fallback
-    for ext in IMAGE_EXTENSIONS:
-        matches = list(runs_dir.rglob(f"{stem}{ext}"))
-        if matches:
-            return matches[0]
-    raise FileNotFoundError(f"Image for label not found: {stem}")
+def _scan_files(directory: str, depth: int = 0) -> Iterable[tuple[os.DirEntry, int]]:
+    """os.scandir로 폴더를 재귀 순회하며 (파일 항목, 깊이)를 이름순으로 돌려준다."""
+    with os.scandir(directory) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
+    subdirs = []
+    for entry in entries:
+        # d_type을 쓰므로 항목마다 stat을 호출하지 않는다(심볼릭 링크 폴더는 따라가지 않음)
+        if entry.is_dir(follow_symlinks=False):
+            subdirs.append(entry)
+        else:
+            yield entry, depth
+    for entry in subdirs:
+        yield from _scan_files(entry.path, depth + 1)
+
+
+def label_run_dir(runs_dir: Path, label_path: Path) -> Path:
+    """레이블이 속한 실행 폴더(labels 폴더의 부모, 아니면 runs_dir)를 반환한다."""
+    return label_path.parent.parent if label_path.parent.name == "labels" else runs_dir
+
+
+def index_runs(runs_dir: Path, labels_dir: Path) -> tuple[list[Path], dict[str, list[tuple[int, int, Path]]]]:
+    """runs_dir를 한 번만 순회해 레이블 파일 목록과 stem -> (깊이, 확장자 순위, 경로) 후보 색인을 만든다."""
+    runs_prefix = os.path.join(str(runs_dir), "")
+    labels_prefix = os.path.join(str(labels_dir), "")
+    labels_inside = labels_prefix.startswith(runs_prefix)
+    label_files: list[Path] = []
+    index: dict[str, list[tuple[int, int, Path]]] = {}
+    for entry, depth in _scan_files(str(runs_dir)):
+        stem, ext = os.path.splitext(entry.name)
+        if ext in IMAGE_EXTENSIONS:
+            index.setdefault(stem, []).append((depth, IMAGE_EXTENSIONS.index(ext), Path(entry.path)))
+        elif ext == ".txt" and labels_inside and entry.path.startswith(labels_prefix):
+            label_files.append(Path(entry.path))
+
+    # --labels-dir가 runs_dir 밖에 있으면 레이블 폴더를 따로 순회하고,
+    # 레이블의 실행 폴더가 runs_dir 밖이면 그 폴더 바로 아래 이미지도 후보에 넣는다(깊이 -1: 폴백 검색에서 제외)
+    if not labels_inside:
+        label_files = [Path(entry.path) for entry, _ in _scan_files(str(labels_dir)) if entry.name.endswith(".txt")]
+        outside_dirs = {label_run_dir(runs_dir, label) for label in label_files}
+        for directory in sorted(outside_dirs):
+            if os.path.join(str(directory), "").startswith(runs_prefix) or not directory.is_dir():
+                continue
+            with os.scandir(directory) as it:
+                for entry in sorted(it, key=lambda entry: entry.name):
+                    stem, ext = os.path.splitext(entry.name)
+                    if ext in IMAGE_EXTENSIONS and entry.is_file():
+                        index.setdefault(stem, []).append((-1, IMAGE_EXTENSIONS.index(ext), Path(entry.path)))
+    label_files.sort()
+    return label_files, index
+
+
+def find_image_for_label(
+    runs_dir: Path,
+    label_path: Path,
+    image_index: dict[str, list[tuple[int, int, Path]]],
+) -> Path:
+    """레이블과 같은 이름의 이미지를 색인에서 찾는다(실행 폴더 -> runs_dir -> 가장 얕은 하위 폴더 순)."""
+    candidates = image_index.get(label_path.stem)
+    if candidates:
+        for directory in (label_run_dir(runs_dir, label_path), runs_dir):
+            matches = [(rank, path) for _, rank, path in candidates if path.parent == directory]
+            if matches:
+                return min(matches, key=lambda match: match[0])[1]
+        # 하위 폴더 어디든 같은 이름의 이미지가 있으면 얕은 폴더, 확장자 우선순위 순으로 사용
+        nested = [candidate for candidate in candidates if candidate[0] >= 0]
+        if nested:
+            return min(nested, key=lambda candidate: candidate[:2])[2]
+    raise FileNotFoundError(f"Image for label not found: {label_path.stem}")
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes:
+    """스트림에서 정확히 size 바이트를 읽고, 모자라면 예외를 발생시킨다."""
+    data = stream.read(size)
+    if len(data) != size:
+        raise ValueError("Unexpected end of image header")
+    return data
+
+
+def _exif_orientation(segment: bytes) -> int:
+    """JPEG APP1(Exif) 세그먼트에서 Orientation 태그 값을 읽는다(없으면 1)."""
+    if not segment.startswith(b"Exif\x00\x00"):
+        return 1
+    tiff = segment[6:]
+    order = "<" if tiff[:2] == b"II" else ">"
+    try:
+        (ifd_offset,) = struct.unpack_from(order + "I", tiff, 4)
+        (count,) = struct.unpack_from(order + "H", tiff, ifd_offset)
+        for index in range(count):
+            entry = ifd_offset + 2 + 12 * index
+            tag, _, _ = struct.unpack_from(order + "HHI", tiff, entry)
+            if tag == 0x0112:
+                return struct.unpack_from(order + "H", tiff, entry + 8)[0]
+    except struct.error:
+        pass
+    return 1
+
+
+def _jpeg_size(stream: BinaryIO) -> tuple[int, int]:
+    """JPEG 마커를 따라가며 SOF 세그먼트의 크기를 읽는다(EXIF 회전은 cv2.imread처럼 반영)."""
+    stream.seek(2)
+    orientation = 1
+    while True:
+        if _read_exact(stream, 1) != b"\xff":
+            continue
+        marker = _read_exact(stream, 1)[0]
+        while marker == 0xFF:
+            marker = _read_exact(stream, 1)[0]
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            continue
+        if marker in (0xD9, 0xDA):
+            raise ValueError("JPEG frame header not found")
+        (length,) = struct.unpack(">H", _read_exact(stream, 2))
+        if marker in JPEG_SOF_MARKERS:
+            _, height, width = struct.unpack(">BHH", _read_exact(stream, 5))
+            # Orientation 5~8은 90도 회전이므로 가로/세로가 바뀐다
+            return (height, width) if 5 <= orientation <= 8 else (width, height)
+        if marker == 0xE1 and orientation == 1:
+            orientation = _exif_orientation(_read_exact(stream, length - 2))
+        else:
+            stream.seek(length - 2, 1)
+
+
+def _webp_size(header: bytes) -> tuple[int, int]:
+    """WebP 첫 청크(VP8/VP8L/VP8X)에서 크기를 읽는다."""
+    # 세 청크 모두 크기 필드가 헤더 30바이트 안에 있으므로, 잘린 파일은 먼저 걸러낸다
+    if len(header) < 30:
+        raise ValueError("Truncated WebP header")
+    chunk = header[12:16]
+    if chunk == b"VP8 " and header[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack_from("<HH", header, 26)
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and header[20] == 0x2F:
+        (bits,) = struct.unpack_from("<I", header, 21)
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        width = int.from_bytes(header[24:27], "little") + 1
+        height = int.from_bytes(header[27:30], "little") + 1
+        return width, height
+    raise ValueError("Unsupported WebP chunk")
+
+
+def _tiff_size(stream: BinaryIO, header: bytes) -> tuple[int, int]:
+    """TIFF 첫 IFD의 ImageWidth/ImageLength 태그를 읽는다."""
+    order = "<" if header[:2] == b"II" else ">"
+    (ifd_offset,) = struct.unpack_from(order + "I", header, 4)
+    stream.seek(ifd_offset)
+    (count,) = struct.unpack(order + "H", _read_exact(stream, 2))
+    entries = _read_exact(stream, 12 * count)
+    size: dict[int, int] = {}
+    for index in range(count):
+        tag, value_type, _ = struct.unpack_from(order + "HHI", entries, 12 * index)
+        if tag in (256, 257):
+            fmt = "H" if value_type == 3 else "I"
+            size[tag] = struct.unpack_from(order + fmt, entries, 12 * index + 8)[0]
+    if 256 not in size or 257 not in size:
+        raise ValueError("TIFF image size tags not found")
+    return size[256], size[257]
+
+
+def read_image_size(path: Path) -> tuple[int, int]:
+    """픽셀을 디코딩하지 않고 이미지 헤더만 읽어 (width, height)를 반환한다."""
+    with path.open("rb") as stream:
+        header = stream.read(32)
+        try:
+            if header.startswith(b"\x89PNG\r\n\x1a\n"):
+                return struct.unpack_from(">II", header, 16)
+            if header.startswith(b"\xff\xd8"):
+                return _jpeg_size(stream)
+            if header.startswith(b"BM"):
+                (dib_size,) = struct.unpack_from("<I", header, 14)
+                if dib_size == 12:
+                    return struct.unpack_from("<HH", header, 18)
+                width, height = struct.unpack_from("<ii", header, 18)
+                return width, abs(height)
+            if header.startswith(b"RIFF") and header[8:12] == b"WEBP":
+                return _webp_size(header)
+            if header[:4] in (b"II*\x00", b"MM\x00*"):
+                return _tiff_size(stream, header)
+        except (struct.error, IndexError) as err:
+            raise ValueError(f"Corrupt image header: {path}") from err
+    raise ValueError(f"Unsupported image format: {path}")
+
+
+@lru_cache(maxsize=None)
+def cached_image_size(image_path: Path) -> tuple[int, int]:
+    """여러 레이블이 같은 이미지를 가리킬 때 헤더를 한 번만 읽도록 크기를 캐시한다."""
+    return read_image_size(image_path)
 
 
 def clamp(value: float, min_value: float, max_value: float) -> float:
@@ -133,14 +374,9 @@ def convert_to_pixels(
     return int(round(x1)), int(round(y1)), int(round(x2)), int(round(y2))
 
 
-def iter_label_files(labels_dir: Path) -> Iterable[Path]:
-    """레이블 폴더 아래의 TXT 파일을 순회한다."""
-    yield from sorted(labels_dir.rglob("*.txt"))
-
-
-def build_detection(
+def build_detection_dict(
     class_id: int,
-    class_names: list[str] | None,
+    class_names: tuple[str, ...] | None,
     confidence: float | None,
     cx: float,
     cy: float,
@@ -148,19 +384,19 @@ def build_detection(
     h: float,
     width: int,
     height: int,
-) -> Detection:
-    """정규화 좌표를 포함한 Detection 인스턴스를 생성한다."""
+) -> dict:
+    """정규화 좌표로부터 Detection 객체를 거치지 않고 JSON용 감지 dict를 바로 만든다."""
     class_name = None
     if class_names and 0 <= class_id < len(class_names):
         class_name = class_names[class_id]
-    bbox_pixels = convert_to_pixels(cx, cy, w, h, width, height)
-    return Detection(
-        class_id=class_id,
-        class_name=class_name,
-        confidence=confidence,
-        bbox_norm=(cx, cy, w, h),
-        bbox_pixels=bbox_pixels,
-    )
+    x1, y1, x2, y2 = convert_to_pixels(cx, cy, w, h, width, height)
+    return {
+        "class_id": class_id,
+        "class_name": class_name,
+        "confidence": confidence,
+        "bbox": {"x1": x1, "y1": y1, "x2": x2, "y2": y2},
+        "bbox_norm": {"cx": cx, "cy": cy, "w": w, "h": h},
+    }
 
 
 def detection_to_dict(det: Detection) -> dict:
@@ -176,6 +412,236 @@ def detection_to_dict(det: Detection) -> dict:
     }
 
 
+def lookup_class_names(class_ids: np.ndarray, class_names: tuple[str, ...] | None) -> list[str | None]:
+    """클래스 id 배열을 이름 목록으로 바꾼다(이름이 없거나 범위 밖이면 None)."""
+    if not class_names:
+        return [None] * len(class_ids)
+    # 범위 검사는 배열로 한 번에 하고, 범위 밖 id는 끝에 붙인 None 칸을 가리키게 한다
+    n_names = len(class_names)
+    names = class_names + (None,)
+    indices = np.where((class_ids >= 0) & (class_ids < n_names), class_ids, n_names)
+    return [names[i] for i in indices.tolist()]
+
+
+def convert_label_rows(
+    rows: np.ndarray,
+    class_names: tuple[str, ...] | None,
+    width: int,
+    height: int,
+) -> list[dict]:
+    """(N, 5|6) 레이블 배열을 한 번에 픽셀 좌표로 변환해 감지 dict 목록을 만든다."""
+    class_ids = rows[:, 0].astype(np.int64)
+    cx, cy, w, h = rows[:, 1], rows[:, 2], rows[:, 3], rows[:, 4]
+    # 자르기/환산은 커널(numba JIT 또는 numpy)에 맡기고 반올림만 여기서 한다
+    x1, y1, x2, y2 = np.rint(norm_to_pixels(cx, cy, w, h, width, height)).astype(np.int64).T
+    confidences = rows[:, 5].tolist() if rows.shape[1] > 5 else [None] * len(rows)
+
+    detections: list[dict] = []
+    # 계산은 배열로 끝내고, 열 값을 파이썬 값으로 한 번에 꺼내 dict만 만든다
+    for class_id, class_name, conf, bx1, by1, bx2, by2, ncx, ncy, nw, nh in zip(
+        class_ids.tolist(),
+        lookup_class_names(class_ids, class_names),
+        confidences,
+        x1.tolist(),
+        y1.tolist(),
+        x2.tolist(),
+        y2.tolist(),
+        cx.tolist(),
+        cy.tolist(),
+        w.tolist(),
+        h.tolist(),
+    ):
+        detections.append(
+            {
+                "class_id": class_id,
+                "class_name": class_name,
+                "confidence": conf,
+                "bbox": {"x1": bx1, "y1": by1, "x2": bx2, "y2": by2},
+                "bbox_norm": {"cx": ncx, "cy": ncy, "w": nw, "h": nh},
+            }
+        )
+    return detections
+
+
+def convert_label_columns(
+    rows: np.ndarray,
+    class_names: tuple[str, ...] | None,
+    width: int,
+    height: int,
+) -> dict:
+    """(N, 5|6) 레이블 배열을 감지별 dict 없이 열 단위(SoA) 배열 dict로 변환한다."""
+    class_ids = rows[:, 0].astype(np.int64)
+    # 열 배열은 orjson이 그대로 직렬화할 수 있도록 C 연속 배열로 만든다
+    cx, cy, w, h = np.ascontiguousarray(rows[:, 1:5].T)
+    x1, y1, x2, y2 = np.ascontiguousarray(np.rint(norm_to_pixels(cx, cy, w, h, width, height)).astype(np.int64).T)
+    return {
+        "class_id": class_ids,
+        "class_name": lookup_class_names(class_ids, class_names),
+        "confidence": np.ascontiguousarray(rows[:, 5]) if rows.shape[1] > 5 else [None] * len(rows),
+        "x1": x1,
+        "y1": y1,
+        "x2": x2,
+        "y2": y2,
+        "cx": cx,
+        "cy": cy,
+        "w": w,
+        "h": h,
+    }
+
+
+def detections_to_columns(detections: list[dict]) -> dict:
+    """감지 dict 목록을 convert_label_columns와 같은 열 단위 dict로 바꾼다."""
+    columns: dict[str, list] = {key: [] for key in ("class_id", "class_name", "confidence")}
+    columns.update({key: [] for key in ("x1", "y1", "x2", "y2", "cx", "cy", "w", "h")})
+    for det in detections:
+        for key in ("class_id", "class_name", "confidence"):
+            columns[key].append(det[key])
+        for group in ("bbox", "bbox_norm"):
+            for key, value in det[group].items():
+                columns[key].append(value)
+    return columns
+
+
+def parse_label_file(
+    label_file: Path,
+    data: bytes,
+    class_names: tuple[str, ...] | None,
+    width: int,
+    height: int,
+    columnar: bool = False,
+) -> list[dict] | dict:
+    """미리 읽은 레이블 파일 내용을 numpy로 한 번에 파싱해 감지 dict 목록(columnar면 열 단위 dict)으로 변환한다."""
+    # 숫자뿐인 내용은 문자열로 디코딩하지 않고 바이트 그대로 numpy에 넘긴다
+    if not data.strip():
+        return detections_to_columns([]) if columnar else []
+
+    try:
+        rows = np.loadtxt(io.BytesIO(data), dtype=np.float64, ndmin=2, comments=None)
+    except ValueError:
+        rows = None
+    if rows is not None and rows.shape[1] >= 5 and np.isfinite(rows).all():
+        if columnar:
+            return convert_label_columns(rows, class_names, width, height)
+        return convert_label_rows(rows, class_names, width, height)
+
+    # 열 개수가 섞였거나 잘못된 줄이 있으면 줄 단위로 파싱해 해당 줄만 건너뛴다
+    detections: list[dict] = []
+    for raw_line in data.splitlines():
+        if not raw_line.strip():
+            continue
+        try:
+            class_id, cx, cy, w, h, confidence = parse_label_line(raw_line.decode("utf-8"))
+            detections.append(
+                build_detection_dict(
+                    class_id,
+                    class_names,
+                    confidence,
+                    cx,
+                    cy,
+                    w,
+                    h,
+                    width,
+                    height,
+                )
+            )
+        except ValueError as err:
+            print(f"[WARN] Skipping malformed line in {label_file}: {err}", file=sys.stderr)
+    return detections_to_columns(detections) if columnar else detections
+
+
+def relative_prefix(runs_dir: Path) -> str:
+    """runs_dir 아래 경로 문자열에서 잘라내면 상대 경로가 되는 접두사를 만든다."""
+    runs_str = str(runs_dir)
+    # Path('.') 아래 경로는 문자열에 './'가 붙지 않으므로 잘라낼 것이 없다
+    return "" if runs_str == os.curdir else os.path.join(runs_str, "")
+
+
+@dataclass(slots=True, frozen=True)
+class PrefetchedLabel:
+    """I/O 단계에서 미리 읽어 둔 레이블 내용과 짝이 되는 이미지 정보."""
+
+    label_file: Path
+    data: bytes
+    image_path: Path | None
+    width: int
+    height: int
+
+
+def prefetch_label(
+    label_file: Path,
+    runs_dir: Path,
+    image_index: dict[str, list[tuple[int, int, Path]]],
+    image_size: tuple[int, int] | None = None,
+) -> PrefetchedLabel:
+    """레이블 하나에 필요한 파일 I/O(이미지 헤더, 레이블 내용)만 수행한다."""
+    if image_size is not None:
+        # 해상도가 고정이면 이미지 파일을 열지 않고, 이미지가 없으면 레이블 이름으로 대신한다
+        width, height = image_size
+        try:
+            image_path = find_image_for_label(runs_dir, label_file, image_index)
+        except FileNotFoundError:
+            image_path = None
+    else:
+        image_path = find_image_for_label(runs_dir, label_file, image_index)
+        # 픽셀 디코딩 없이 헤더에서 해상도만 읽는다
+        try:
+            width, height = cached_image_size(image_path)
+        except (OSError, ValueError) as err:
+            raise OSError(f"Failed to load image for {label_file}") from err
+    return PrefetchedLabel(label_file, label_file.read_bytes(), image_path, width, height)
+
+
+def build_record(
+    io_future: Future,
+    class_names: tuple[str, ...] | None,
+    prefix: str | None,
+    columnar: bool = False,
+) -> dict:
+    """I/O 단계 결과를 받아 레이블을 파싱하고 이미지 단위 레코드로 만든다(I/O 실패는 그대로 전달)."""
+    prefetched: PrefetchedLabel = io_future.result()
+    image_path = prefetched.image_path
+    detections = parse_label_file(
+        prefetched.label_file,
+        prefetched.data,
+        class_names,
+        prefetched.width,
+        prefetched.height,
+        columnar,
+    )
+
+    image_path_field = None
+    if image_path is not None:
+        # 색인의 이미지 경로는 runs_dir 문자열로 시작하므로 PurePath 연산 없이 접두사만 잘라낸다
+        image_path_field = str(image_path)
+        if prefix is not None:
+            image_path_field = image_path_field.removeprefix(prefix)
+
+    # 이미지 단위 레코드 구성
+    return {
+        "image": image_path.name if image_path is not None else prefetched.label_file.stem,
+        "image_path": image_path_field,
+        "width": prefetched.width,
+        "height": prefetched.height,
+        "detections": detections,
+    }
+
+
+def numpy_to_list(value):
+    """json 모듈이 모르는 numpy 배열을 리스트로 바꿔 직렬화할 수 있게 한다."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_record(record: dict) -> bytes:
+    """레코드 하나를 indent=2 최상위 배열의 항목 형태(들여쓰기 2칸 추가)로 직렬화한다."""
+    if orjson is not None:
+        # JSON 문자열 안에는 줄바꿈이 이스케이프되므로 줄 단위 들여쓰기가 안전하다(열 배열은 tolist 없이 직렬화)
+        options = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+        return orjson.dumps(record, option=options).replace(b"\n", b"\n  ")
+    return json.dumps(record, indent=2, default=numpy_to_list).replace("\n", "\n  ").encode("utf-8")
+
+
 def main() -> int:
     """스크립트 진입점: YOLO TXT를 JSON으로 변환한다."""
     args = parse_args()
@@ -197,59 +663,76 @@ def main() -> int:
         print(f"[ERROR] {err}", file=sys.stderr)
         return 1
 
-    records: list[dict] = []
-    # 각 레이블 파일을 순회하며 JSON 레코드 생성
-    for label_file in iter_label_files(labels_dir):
-        try:
-            image_path = find_image_for_label(runs_dir, label_file)
-        except FileNotFoundError as err:
-            print(f"[WARN] {err}", file=sys.stderr)
-            continue
-
-        image = cv2.imread(str(image_path))
-        if image is None:
-            print(f"[WARN] Failed to load image for {label_file}", file=sys.stderr)
-            continue
-        height, width = image.shape[:2]
+    refine = args.min_conf is not None or args.classes is not None or args.drop_empty or args.sort_desc
+    if refine and args.columnar:
+        print("[ERROR] --columnar cannot be combined with --min-conf/--classes/--drop-empty/--sort-desc.", file=sys.stderr)
+        return 1
+    min_conf = args.min_conf if args.min_conf is not None else 0.0
+    allowed_ids, allowed_names = parse_class_filter(args.classes)
 
-        detections: list[dict] = []
-        # YOLO TXT 각 줄(감지 정보)을 파싱
-        for raw_line in label_file.read_text(encoding="utf-8").splitlines():
-            if not raw_line.strip():
-                continue
-            try:
-                class_id, cx, cy, w, h, confidence = parse_label_line(raw_line)
-                detection = build_detection(
-                    class_id,
-                    class_names,
-                    confidence,
-                    cx,
-                    cy,
-                    w,
-                    h,
-                    width,
-                    height,
-                )
-                detections.append(detection_to_dict(detection))
-            except ValueError as err:
-                print(f"[WARN] Skipping malformed line in {label_file}: {err}", file=sys.stderr)
-
-        # 이미지 단위 레코드 구성
-        image_record = {
-            "image": image_path.name,
-            "image_path": str(image_path.relative_to(runs_dir) if args.relative_paths else image_path),
-            "width": width,
-            "height": height,
-            "detections": detections,
-        }
-        records.append(image_record)
-
-    if not records:
+    # 레이블 목록과 이미지 위치를 한 번의 순회로 색인
+    label_files, image_index = index_runs(runs_dir, labels_dir)
+    prefix = relative_prefix(runs_dir) if args.relative_paths else None
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    exported = 0
+    # 전체 레코드를 메모리에 모으지 않고, 순서대로 완료되는 레코드를 배열 항목으로 바로 기록한다
+    # 파일 읽기는 대부분 디스크 대기이므로 I/O 단계는 최대 MAX_IO_WORKERS개를 동시에 걸어 두고,
+    # GIL을 잡는 파싱/dict 생성은 코어 수만큼의 작업자에게 맡긴다
+    workers = max(1, min(os.cpu_count() or 1, len(label_files)))
+    io_workers = max(1, min(MAX_IO_WORKERS, len(label_files)))
+    # 임시 파일에 기록한 뒤 성공했을 때만 교체해, 중간에 실패해도 기존 출력이 깨진 JSON으로 남지 않게 한다
+    tmp_output = args.output.with_name(f".{args.output.name}.{os.getpid()}.tmp")
+    try:
+        with ThreadPoolExecutor(max_workers=io_workers) as io_executor, ThreadPoolExecutor(
+            max_workers=workers
+        ) as executor, open(tmp_output, "wb", buffering=1 << 20) as stream:
+            remaining = iter(label_files)
+            io_pending = deque(
+                io_executor.submit(prefetch_label, label_file, runs_dir, image_index, args.image_size)
+                for label_file in islice(remaining, io_workers)
+            )
+            pending: deque[Future] = deque()
+
+            def feed() -> None:
+                """파싱 창(작업자 수의 두 배)을 채우고, 빠진 만큼 다음 레이블 읽기를 건다."""
+                while io_pending and len(pending) < 2 * workers:
+                    io_future = io_pending.popleft()
+                    next_label = next(remaining, None)
+                    if next_label is not None:
+                        io_pending.append(
+                            io_executor.submit(prefetch_label, next_label, runs_dir, image_index, args.image_size)
+                        )
+                    pending.append(executor.submit(build_record, io_future, class_names, prefix, args.columnar))
+
+            feed()
+            stream.write(b"[")
+            while pending:
+                future = pending.popleft()
+                feed()
+                try:
+                    record = future.result()
+                except OSError as err:
+                    print(f"[WARN] {err}", file=sys.stderr)
+                    continue
+                if refine:
+                    # 레코드 단위로 정제해 스트리밍 기록을 유지한다
+                    refined = refine_records([record], min_conf, allowed_ids, allowed_names, args.drop_empty, args.sort_desc)
+                    if not refined:
+                        continue
+                    record = refined[0]
+                stream.write(b",\n  " if exported else b"\n  ")
+                stream.write(encode_record(record))
+                exported += 1
+            stream.write(b"\n]" if exported else b"]")
+    except BaseException:
+        tmp_output.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_output, args.output)
+
+    if not exported:
         print("[WARN] No detections exported; check the runs directory and label files.", file=sys.stderr)
 
-    args.output.parent.mkdir(parents=True, exist_ok=True)
-    args.output.write_text(json.dumps(records, indent=2), encoding="utf-8")
-    print(f"Exported {len(records)} image entries to {args.output}")
+    print(f"Exported {exported} image entries to {args.output}")
     return 0
 
 
@@ -0,0 +1,64 @@
+"""한글 주석 버전: 정규화 YOLO 박스를 픽셀 좌표로 바꾸는 수치 커널(numba가 있으면 JIT 컴파일)."""
+
+from __future__ import annotations
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - handled at runtime
+    njit = None  # type: ignore
+
+# numba 설치 여부(없으면 같은 연산을 numpy로 수행)
+NUMBA_AVAILABLE = njit is not None
+
+
+def _norm_to_pixels_loop(cx, cy, w, h, width, height, out):
+    """감지마다 중심/크기를 픽셀로 환산하고 이미지 범위로 잘라 out에 기록한다."""
+    for i in range(cx.shape[0]):
+        x_center = cx[i] * width
+        y_center = cy[i] * height
+        box_w = w[i] * width
+        box_h = h[i] * height
+        out[i, 0] = min(max(x_center - box_w / 2, 0.0), width)
+        out[i, 1] = min(max(y_center - box_h / 2, 0.0), height)
+        out[i, 2] = min(max(x_center + box_w / 2, 0.0), width)
+        out[i, 3] = min(max(y_center + box_h / 2, 0.0), height)
+
+
+# fastmath는 곱셈-뺄셈 융합으로 numpy 경로와 반올림 결과가 달라질 수 있어 사용하지 않는다
+# cache=True로 컴파일 결과를 __pycache__에 저장해 두 번째 실행부터는 컴파일 없이 불러온다
+_norm_to_pixels_jit = njit(cache=True)(_norm_to_pixels_loop) if NUMBA_AVAILABLE else None
+
+# compile_kernels.py로 미리 컴파일한 확장 모듈이 있으면 JIT보다 우선 사용(numba 없이도 동작)
+try:
+    from kernels_aot import norm_to_pixels as _norm_to_pixels_aot
+except ImportError:  # pragma: no cover - handled at runtime
+    _norm_to_pixels_aot = None
+
+_norm_to_pixels_compiled = _norm_to_pixels_aot if _norm_to_pixels_aot is not None else _norm_to_pixels_jit
+
+
+def norm_to_pixels(
+    cx: np.ndarray,
+    cy: np.ndarray,
+    w: np.ndarray,
+    h: np.ndarray,
+    width: int,
+    height: int,
+) -> np.ndarray:
+    """정규화 (cx, cy, w, h) 배열을 범위로 자른 픽셀 (x1, y1, x2, y2) 실수 배열(N, 4)로 변환한다."""
+    out = np.empty((cx.shape[0], 4), dtype=np.float64)
+    if _norm_to_pixels_compiled is not None:
+        _norm_to_pixels_compiled(cx, cy, w, h, float(width), float(height), out)
+        return out
+
+    x_center = cx * width
+    y_center = cy * height
+    box_w = w * width
+    box_h = h * height
+    np.clip(x_center - box_w / 2, 0, width, out=out[:, 0])
+    np.clip(y_center - box_h / 2, 0, height, out=out[:, 1])
+    np.clip(x_center + box_w / 2, 0, width, out=out[:, 2])
+    np.clip(y_center + box_h / 2, 0, height, out=out[:, 3])
+    return out
@@ -4,19 +4,37 @@ from __future__ import annotations
 
 import argparse
 import json
+import re
 import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
-from ultralytics import YOLO
+from typing import Any, Callable
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore
 
 # =================================================================
 # [추가] YOLOv8n 기본 COCO 80 클래스 ID-이름 매핑
 # class_name이 JSON에 없을 경우, 이 정보를 사용하여 복구합니다.
+# export_detections.py에서 refine_records를 가져다 쓸 때 모델을 불필요하게 로드하지 않도록
+# 실제로 복구가 필요한 첫 시점에 한 번만 불러옵니다.
 # =================================================================
-model = YOLO('yolov8n.pt')
-CLASS_ID_TO_NAME: dict[int, str] = model.names
+@lru_cache(maxsize=1)
+def class_id_to_name() -> dict[int, str]:
+    """YOLOv8n 모델의 클래스 ID-이름 매핑을 처음 필요할 때 로드한다."""
+    from ultralytics import YOLO
+
+    model = YOLO('yolov8n.pt')
+    return model.names
 # =================================================================
 
+# 클래스 필터에서 숫자 id로 취급할 토큰(부호 허용 정수)
+_INT_RE = re.compile(r"[+-]?\d+")
+
 
 def parse_args() -> argparse.Namespace:
     """CLI 인자를 정의하고 파싱한다."""
@@ -47,6 +65,9 @@ def load_json(path: Path) -> list[dict[str, Any]]:
     """JSON 파일을 로드하고 리스트로 반환한다."""
     if not path.is_file():
         raise FileNotFoundError(f"Input JSON not found: {path}")
+    if orjson is not None:
+        # 문자열 디코딩 없이 바이트에서 바로 파싱
+        return orjson.loads(path.read_bytes())
     return json.loads(path.read_text(encoding="utf-8"))
 
 
@@ -60,43 +81,68 @@ def parse_class_filter(spec: str | None) -> tuple[set[int], set[str]]:
         token = item.strip()
         if not token:
             continue
-        try:
+        if _INT_RE.fullmatch(token):
             ids.add(int(token))
-            continue
-        except ValueError:
+        else:
             names.add(token.lower())
     return ids, names
 
 
-def detection_passes(
-    detection: dict[str, Any],
-    min_conf: float,
+def recover_class_name(detection: dict[str, Any]) -> Any:
+    """class_name이 없으면 모델 클래스 매핑으로 복구해 감지에 기록하고, 사용할 이름을 반환한다."""
+    class_name = detection.get("class_name")
+    if class_name is None:
+        class_id = detection.get("class_id")
+        if isinstance(class_id, int):
+            recovered_name = class_id_to_name().get(class_id)
+            if recovered_name:
+                class_name = recovered_name
+                detection["class_name"] = recovered_name # JSON에 실제로 class_name을 추가하지는 않지만, 이 함수 내에서 사용하기 위해 임시로 설정
+    return class_name
+
+
+def make_class_predicate(
     allowed_ids: set[int],
     allowed_names: set[str],
-) -> bool:
-    """감지가 필터 조건을 통과하는지 판단한다."""
-    conf = detection.get("confidence")
-    conf_value = float(conf) if conf is not None else 0.0
-    if conf_value < min_conf:
-        return False
-
+) -> Callable[[dict[str, Any]], bool] | None:
+    """활성화된 클래스 필터 조합에 맞춘 판정 함수를 만든다(필터가 없으면 None)."""
     if not allowed_ids and not allowed_names:
-        return True
+        return None
 
-    class_id = detection.get("class_id")
-    class_name = detection.get("class_name")
-    if class_name is None and isinstance(class_id, int):
-        recovered_name = CLASS_ID_TO_NAME.get(class_id)
-        if recovered_name:
-            class_name = recovered_name
-            detection["class_name"] = recovered_name # JSON에 실제로 class_name을 추가하지는 않지만, 이 함수 내에서 사용하기 위해 임시로 설정
+    if not allowed_names:
+
+        def passes_ids(detection: dict[str, Any]) -> bool:
+            recover_class_name(detection)
+            class_id = detection.get("class_id")
+            return isinstance(class_id, int) and class_id in allowed_ids
+
+        return passes_ids
+
+    if not allowed_ids:
+
+        def passes_names(detection: dict[str, Any]) -> bool:
+            class_name = recover_class_name(detection)
+            return isinstance(class_name, str) and class_name.lower() in allowed_names
 
-    if allowed_ids and isinstance(class_id, int) and class_id in allowed_ids:
-        return True
-    if allowed_names and isinstance(class_name, str) and class_name.lower() in allowed_names:
-        return True
+        return passes_names
 
-    return False
+    def passes_both(detection: dict[str, Any]) -> bool:
+        class_name = recover_class_name(detection)
+        class_id = detection.get("class_id")
+        if isinstance(class_id, int) and class_id in allowed_ids:
+            return True
+        return isinstance(class_name, str) and class_name.lower() in allowed_names
+
+    return passes_both
+
+
+def confidence_array(detections: list[dict[str, Any]]) -> np.ndarray:
+    """감지 목록의 신뢰도를 float64 배열로 모은다(값이 없으면 0.0)."""
+    return np.fromiter(
+        (0.0 if (conf := det.get("confidence")) is None else float(conf) for det in detections),
+        dtype=np.float64,
+        count=len(detections),
+    )
 
 
 def refine_records(
@@ -109,16 +155,20 @@ def refine_records(
 ) -> list[dict[str, Any]]:
     """전체 이미지 레코드에 대해 필터링을 적용한다."""
     refined: list[dict[str, Any]] = []
+    # 클래스 필터 조합은 실행 중 바뀌지 않으므로 판정 함수를 한 번만 만든다
+    class_passes = make_class_predicate(allowed_ids, allowed_names)
     for record in records:
         detections = record.get("detections", [])
-        filtered = [
-            det
-            for det in detections
-            if detection_passes(det, min_conf, allowed_ids, allowed_names)
-        ]
+        confs = confidence_array(detections)
+        # 신뢰도는 배열로 한 번에 비교하고(NaN은 기존처럼 통과), 통과한 감지에만 클래스 필터(이름 복구 포함)를 적용
+        keep = np.flatnonzero(~(confs < min_conf))
+        if class_passes is not None:
+            keep = np.fromiter((i for i in keep.tolist() if class_passes(detections[i])), dtype=np.intp)
 
         if sort_desc:
-            filtered.sort(key=lambda d: float(d.get("confidence") or 0.0), reverse=True)
+            # 이미 모은 신뢰도 열로 정렬 순서를 구한다(안정 정렬이라 동점은 원래 순서 유지)
+            keep = keep[np.argsort(-confs[keep], kind="stable")]
+        filtered = [detections[i] for i in keep.tolist()]
 
         if drop_empty and not filtered:
             continue
@@ -170,7 +220,11 @@ def main() -> int:
         print("[WARN] No records remaining after refinement.", file=sys.stderr)
 
     args.output.parent.mkdir(parents=True, exist_ok=True)
-    args.output.write_text(json.dumps(refined_records, indent=2), encoding="utf-8")
+    if orjson is not None:
+        # C 확장으로 UTF-8 바이트를 바로 만들어 그대로 기록
+        args.output.write_bytes(orjson.dumps(refined_records, option=orjson.OPT_INDENT_2))
+    else:
+        args.output.write_text(json.dumps(refined_records, indent=2), encoding="utf-8")
     print(f"Saved refined detections to {args.output}")
     return 0
 